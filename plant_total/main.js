@@ -34,6 +34,11 @@ const MODBUS_TIMEOUT_MS = 2000;
 const REGISTER_ADDR = 390; // Active Power W (Float)
 const REGISTER_LEN = 2;
 
+// Float decoding scratch: the word-swapped bit pattern is written as an integer
+// and read back as a float over the same memory (no per-read Buffer)
+const floatBits = new Uint32Array(1);
+const floatValue = new Float32Array(floatBits.buffer);
+
 function createWindow() {
     mainWindow = new BrowserWindow({
         width: 400,
@@ -66,65 +71,43 @@ app.on('window-all-closed', function () {
     if (process.platform !== 'darwin') app.quit();
 });
 
-async function pollMeters() {
-    if (!mainWindow) return;
-
-    const results = [];
-    let totalKw = 0;
+// Meters on the same IP are read one after another; different IPs in parallel
+function groupMetersByIp(meters) {
+    const byIp = new Map();
+    for (const meter of meters) {
+        if (!byIp.has(meter.ip)) byIp.set(meter.ip, []);
+        byIp.get(meter.ip).push(meter);
+    }
+    return [...byIp.values()];
+}
+const METERS_BY_IP = groupMetersByIp(METERS);
 
-    for (const meter of METERS) {
-        const client = new ModbusRTU();
-        
-        // Add error listener to prevent unhandled error events
-        client.on('error', (e) => {
-            // console.error(`Modbus Client Error (${meter.name}):`, e.message);
-        });
+// A cycle with unreachable meters can outlast the interval (timeouts add up per IP);
+// ticks arriving while one is still running are skipped instead of stacking connections
+let pollInProgress = false;
 
-        let value = 0;
-        let status = 'OK';
+async function pollMeters() {
+    if (!mainWindow || pollInProgress) return;
+    pollInProgress = true;
+    try {
+        await pollCycle();
+    } finally {
+        pollInProgress = false;
+    }
+}
 
-        try {
-            client.setTimeout(MODBUS_TIMEOUT_MS);
-            await client.connectTCP(meter.ip, { port: 502 });
-            client.setID(meter.id);
-
-            const data = await client.readHoldingRegisters(REGISTER_ADDR, REGISTER_LEN);
-            
-            // Parse Float with Word Swapping (Modbus Standard for many meters)
-            // [Word1, Word2] -> [Word2, Word1] -> FloatBE
-            if (data.data && data.data.length >= 2) {
-                const buf = Buffer.alloc(4);
-                buf.writeUInt16BE(data.data[1], 0); // Low word (at index 1) becomes High word
-                buf.writeUInt16BE(data.data[0], 2); // High word (at index 0) becomes Low word
-                value = buf.readFloatBE(0);
-            } else {
-                value = 0;
-            }
-            
-            // Convert W to kW
-            value = value / 1000.0;
-
-            // Sanity check
-            if (isNaN(value)) value = 0;
-
-            totalKw += value;
-
-        } catch (e) {
-            console.error(`Error reading ${meter.name}:`, e.message);
-            status = 'ERROR';
-            value = 0;
-        } finally {
-            try {
-                client.close();
-            } catch (e) {}
+async function pollCycle() {
+    const readings = new Map();
+    await Promise.all(METERS_BY_IP.map(async (meters) => {
+        for (const meter of meters) {
+            readings.set(meter, await readMeter(meter));
         }
+    }));
 
-        results.push({
-            name: meter.name,
-            kw: value,
-            status: status
-        });
-    }
+    // Keep the configured order for display
+    const results = METERS.map(meter => readings.get(meter));
+    let totalKw = 0;
+    for (const r of results) totalKw += r.kw;
 
     // Send data to renderer
     mainWindow.webContents.send('update-data', {
@@ -133,3 +116,54 @@ async function pollMeters() {
         timestamp: new Date().toLocaleTimeString()
     });
 }
+
+async function readMeter(meter) {
+    const client = new ModbusRTU();
+    
+    // Add error listener to prevent unhandled error events
+    client.on('error', (e) => {
+        // console.error(`Modbus Client Error (${meter.name}):`, e.message);
+    });
+
+    let value = 0;
+    let status = 'OK';
+
+    try {
+        client.setTimeout(MODBUS_TIMEOUT_MS);
+        await client.connectTCP(meter.ip, { port: 502 });
+        client.setID(meter.id);
+
+        const data = await client.readHoldingRegisters(REGISTER_ADDR, REGISTER_LEN);
+        
+        // Parse Float with Word Swapping (Modbus Standard for many meters)
+        // [Word1, Word2] -> [Word2, Word1] -> FloatBE
+        if (data.data && data.data.length >= 2) {
+            // Low word (at index 1) becomes High word, High word (at index 0) becomes Low word
+            floatBits[0] = (data.data[1] << 16) | data.data[0];
+            value = floatValue[0];
+        } else {
+            value = 0;
+        }
+        
+        // Convert W to kW
+        value = value / 1000.0;
+
+        // Sanity check
+        if (isNaN(value)) value = 0;
+
+    } catch (e) {
+        console.error(`Error reading ${meter.name}:`, e.message);
+        status = 'ERROR';
+        value = 0;
+    } finally {
+        try {
+            client.close();
+        } catch (e) {}
+    }
+
+    return {
+        name: meter.name,
+        kw: value,
+        status: status
+    };
+}
@@ -14,12 +14,12 @@
 
 const fs = require('fs');
 const path = require('path');
+const crypto = require('crypto');
 const ModbusRTU = require('modbus-serial');
 const XLSX = require('xlsx');
 const chalk = require('chalk');
 const express = require('express');
 const http = require('http');
-const https = require('https');
 const { Server } = require('socket.io');
 
 // ============================================================================
@@ -50,9 +50,17 @@ const CONFIG_FILE = 'config.md';
 let UTILITIES_FILE = 'Utenze_main.xlsx';
 const REGISTERS_FILE = 'registri.csv';
 const PORT = 3000;
+let VERBOSE = false; // Extra diagnostic output (--verbose)
+
+// Known gateway IP for each cabinet, used when the utilities file has no IP column
+const CABINET_IPS = {
+    1: "192.168.156.75",
+    2: "192.168.156.76",
+    3: "192.168.156.77"
+};
 
 // Parse command line arguments to allow overriding the utilities file
-// Usage: node web_datalogger.js --utilities MyFile.xlsx
+// Usage: node web_datalogger.js --utilities MyFile.xlsx [--verbose]
 const args = process.argv.slice(2);
 for (let i = 0; i < args.length; i++) {
     if (args[i] === '--utilities' || args[i] === '-u') {
@@ -60,6 +68,8 @@ for (let i = 0; i < args.length; i++) {
             UTILITIES_FILE = args[i + 1];
             i++;
         }
+    } else if (args[i] === '--verbose' || args[i] === '-v') {
+        VERBOSE = true;
     }
 }
 
@@ -70,23 +80,40 @@ console.log(chalk.blue(`Using utilities file: ${UTILITIES_FILE}`));
 // ============================================================================
 const app = express();
 const server = http.createServer(app);
-const io = new Server(server);
+// Compress larger websocket frames (the readings JSON is highly repetitive);
+// small messages are sent as-is since deflating them costs more than it saves
+const io = new Server(server, {
+    perMessageDeflate: {
+        threshold: 1024,
+        zlibDeflateOptions: { level: 1 }
+    }
+});
 
 // Serve static files from the 'public' directory (index.html, css, etc.)
 app.use(express.static(path.join(__dirname, 'public')));
-// Expose local vendor assets (Chart.js) to avoid CDN dependency in offline networks
-app.use('/vendor', express.static(path.join(__dirname, 'node_modules', 'chart.js', 'dist')));
+// Expose local vendor assets (Chart.js) to avoid CDN dependency in offline networks.
+// They only change with an npm update, so browsers may reuse them without revalidating.
+app.use('/vendor', express.static(path.join(__dirname, 'node_modules', 'chart.js', 'dist'), { maxAge: '1d' }));
 
 // Socket.IO Connection Handling
 io.on('connection', (socket) => {
+    // Static state first: 'update' events only carry the readings
+    socket.emit('meta', getMeta());
+    // Broadcasts only carry changed results, so a new client starts from a full snapshot
+    socket.emit('update', {
+        latestResults,
+        startTime: START_TIME,
+        isPaused
+    });
+
     // Send list of available configuration files
-    const files = getReadFiles();
-    socket.emit('fileList', files);
+    if (!readFilesCache) readFilesCache = getReadFiles();
+    socket.emit('fileList', readFilesCache);
 
     // Handle request for file list refresh
     socket.on('getFiles', () => {
-        const files = getReadFiles();
-        socket.emit('fileList', files);
+        readFilesCache = getReadFiles();
+        socket.emit('fileList', readFilesCache);
     });
 
     // Handle file selection
@@ -94,7 +121,9 @@ io.on('connection', (socket) => {
         if (fs.existsSync(filename) && path.basename(filename).startsWith('Read_')) {
             UTILITIES_FILE = filename;
             utilities = []; // Clear current utilities to force reload
+            metaChanged = true;
             latestResults = {};
+            resultsReset = true;
             console.log(chalk.green(`Client selected utilities file: ${UTILITIES_FILE}`));
             
             // Immediately try to load to give feedback
@@ -118,8 +147,9 @@ io.on('connection', (socket) => {
             selectedMachines: Array.isArray(filters.selectedMachines) ? filters.selectedMachines : [],
             onlySelected: !!filters.onlySelected
         };
-        console.log(chalk.magenta('Filters updated:', JSON.stringify(activeFilters)));
-        loadUtilities(); // Reload to apply filters
+        if (VERBOSE) console.log(chalk.magenta('Filters updated:', JSON.stringify(activeFilters)));
+        metaChanged = true;
+        applyUtilityFilters(); // Filters only: the loaded utilities are reused
         broadcastUpdate();
         needsReload = true; // Trigger immediate restart of polling loop
     });
@@ -129,12 +159,15 @@ io.on('connection', (socket) => {
         if (history[utilId]) {
             socket.emit('historyData', {
                 id: utilId,
-                data: history[utilId]
+                data: historyToArray(history[utilId])
             });
         }
     });
 });
 
+// Last scanned list of Read_* files, shared by new connections until a client asks for a refresh
+let readFilesCache = null;
+
 function getReadFiles() {
     try {
         return fs.readdirSync(__dirname)
@@ -155,14 +188,22 @@ let config = {
     modbus_timeout_s: 3
 };
 let utilities = [];
+let allUtilities = []; // Every utility in the file, before filters are applied
+let utilitiesSource = null; // Parsed rows allUtilities was built from
 let registers = [];
+let registersSource = null; // Parsed rows the current register list was built from
+let readBlocks = []; // Read plan for the current registers (see buildReadBlocks)
 let latestResults = {};
-let history = {}; // Store historical data for graphs
+const changedResults = new Set(); // Utility ids whose result changed since the last broadcast
+let resultsReset = false; // latestResults was replaced: the next broadcast sends all of it
+let history = {}; // Store historical data for graphs: one fixed-size ring per utility (see createHistoryRing)
 const MAX_HISTORY_POINTS = 60; // Keep last 60 readings
 let isPaused = false;
 let availableFilters = { group1: [], group2: [], tags: [] };
 let activeFilters = { group1: [], group2: [], tags: [], minCurrent: 'all', onlyErrors: false, selectedMachines: [], onlySelected: false };
 let needsReload = false;
+let metaChanged = true; // Utilities, registers, config or filters changed since the last 'meta' broadcast
+let configSource = null; // Text of config.md as last parsed
 
 
 
@@ -178,6 +219,10 @@ function loadConfig() {
     try {
         if (fs.existsSync(CONFIG_FILE)) {
             const content = fs.readFileSync(CONFIG_FILE, 'utf8');
+            // Called on every cycle: only parse when the file has changed
+            if (content === configSource) return;
+            configSource = content;
+            metaChanged = true;
             const lines = content.split('\n');
             for (const line of lines) {
                 if (line.includes(':')) {
@@ -205,17 +250,56 @@ function loadConfig() {
     }
 }
 
+// Only cell values are used, so skip formula text, HTML and formatted text
+const DATA_FILE_READ_OPTIONS = {
+    type: 'buffer',
+    sheets: 0,
+    cellFormula: false,
+    cellHTML: false,
+    cellText: false
+};
+
+// Parsed data files keyed by path: { hash, rows }
+// The polling loop reloads its files on every cycle, so unchanged files are
+// served from here instead of being parsed again.
+const dataFileCache = new Map();
+
 /**
- * Helper to read the first sheet of an Excel or CSV file
+ * Resolves the alarm limits from config.md, falling back to the defaults.
+ */
+function getAlarmLimits() {
+    return {
+        pfRedMax: config.pf_red_max !== undefined ? config.pf_red_max : 0.4,
+        vLLMin: config.v_ll_min !== undefined ? config.v_ll_min : 380,
+        vLLMax: config.v_ll_max !== undefined ? config.v_ll_max : 420,
+        vLNMin: config.v_ln_min !== undefined ? config.v_ln_min : 210,
+        vLNMax: config.v_ln_max !== undefined ? config.v_ln_max : 250
+    };
+}
+
+/**
+ * Helper to read the first sheet of an Excel or CSV file.
+ * Only the first sheet is parsed; any other sheets in the workbook are skipped.
+ * Rows are cached on the file content hash and shared between callers,
+ * so they must be treated as read-only.
  */
 function readDataFile(filePath) {
     if (!filePath || !fs.existsSync(filePath)) {
         // console.error(chalk.red(`File not found: ${filePath}`));
         return [];
     }
-    const workbook = XLSX.readFile(filePath);
+    const content = fs.readFileSync(filePath);
+    const hash = crypto.createHash('md5').update(content).digest('hex');
+    const cached = dataFileCache.get(filePath);
+    if (cached && cached.hash === hash) {
+        return cached.rows;
+    }
+
+    const workbook = XLSX.read(content, DATA_FILE_READ_OPTIONS);
     const sheetName = workbook.SheetNames[0];
-    return XLSX.utils.sheet_to_json(workbook.Sheets[sheetName]);
+    const rows = XLSX.utils.sheet_to_json(workbook.Sheets[sheetName]);
+    dataFileCache.set(filePath, { hash, rows });
+    return rows;
 }
 
 /**
@@ -225,113 +309,191 @@ function readDataFile(filePath) {
 function loadUtilities() {
     try {
         const rawData = readDataFile(UTILITIES_FILE);
-        const allUtilities = rawData.map(row => {
-            const name = row['Machine'] || row['Name'] || row['Nome'] || 'Unknown';
-            const cabinet = row['Cabinet'] || row['Quadro'];
-            const node = row['Node'] || row['Nodo'];
-
-            const group1 = row['Group1'] || row['Group 1'] || row['Main Group'] || row['Group'] || 'Unknown';
-            const group2 = row['Group2'] || row['Group 2'] || row['Aux Group'] || row['SubGroup'] || 'Unknown';
-            
-            // Read tags from columns Tag1, Tag2, Tag3... or Tags
-            const tags = [];
-            // Method 1: Split comma separated 'tags'
-            const tagsStr = row['tags'] || row['Tags'];
-            if (tagsStr) {
-                tags.push(...tagsStr.split(',').map(t => t.trim()).filter(t => t));
-            }
-            // Method 2: Read specific columns 'Tag1', 'Tag2', etc. (User said "rimesso in colonne")
-            // Iterate keys to find Tag* columns
-            const keys = Object.keys(row);
-            const tagCols = keys.filter(k => /^Tag\s*\d+$/i.test(k)).sort((a, b) => {
-                // simple sort Tag1, Tag2
-                const nA = parseInt(a.replace(/Tag/i, '').trim());
-                const nB = parseInt(b.replace(/Tag/i, '').trim());
-                return nA - nB;
+        // Rows are cached by readDataFile: only rebuild the utility list when they change
+        if (rawData !== utilitiesSource) {
+            utilitiesSource = rawData;
+
+            // Tag columns ('Tag1', 'Tag 2', ...) in numeric order, resolved once per sheet.
+            // Rows only carry the cells they fill, so collect the names across all rows.
+            const tagColNames = new Set();
+            rawData.forEach(row => {
+                for (const k in row) {
+                    if (/^Tag\s*\d+$/i.test(k)) tagColNames.add(k);
+                }
             });
+            const tagCols = [...tagColNames]
+                .map(col => ({ col, n: parseInt(col.replace(/Tag/i, '').trim()) }))
+                .sort((a, b) => a.n - b.n)
+                .map(t => t.col);
+
+            // Single pass over the rows: rows without an IP or node are skipped in place
+            const loaded = [];
+            for (const row of rawData) {
+                const name = row['Machine'] || row['Name'] || row['Nome'] || 'Unknown';
+                const cabinet = row['Cabinet'] || row['Quadro'];
+                const node = row['Node'] || row['Nodo'];
+
+                const group1 = row['Group1'] || row['Group 1'] || row['Main Group'] || row['Group'] || 'Unknown';
+                const group2 = row['Group2'] || row['Group 2'] || row['Aux Group'] || row['SubGroup'] || 'Unknown';
             
-            tagCols.forEach(col => {
-                const val = row[col];
-                if (val) tags.push(String(val).trim());
-            });
+                // Read tags from columns Tag1, Tag2, Tag3... or Tags
+                const tags = [];
+                // Method 1: Split comma separated 'tags'
+                const tagsStr = row['tags'] || row['Tags'];
+                if (tagsStr) {
+                    tags.push(...tagsStr.split(',').map(t => t.trim()).filter(t => t));
+                }
+                // Method 2: Read specific columns 'Tag1', 'Tag2', etc. (User said "rimesso in colonne")
+                tagCols.forEach(col => {
+                    const val = row[col];
+                    if (val) tags.push(String(val).trim());
+                });
 
-            // If user meant Tag1, Tag2.. this puts them in order. 
-            // If they mixed comma separated and columns, we'll have both.
+                // If user meant Tag1, Tag2.. this puts them in order. 
+                // If they mixed comma separated and columns, we'll have both.
 
-            let ip = row['IP'] || row['Indirizzo IP'];
+                let ip = row['IP'] || row['Indirizzo IP'];
             
-            // Fallback: Map Cabinet ID to known IP addresses if not specified in file
-            if (!ip && cabinet) {
-                const cabinetIps = {
-                    1: "192.168.156.75",
-                    2: "192.168.156.76",
-                    3: "192.168.156.77"
-                };
-                ip = cabinetIps[cabinet];
-            }
+                // Fallback: Map Cabinet ID to known IP addresses if not specified in file
+                if (!ip && cabinet) {
+                    ip = CABINET_IPS[cabinet];
+                }
 
-            return {
-                id: `cab${cabinet}_node${node}`,
-                name: name,
-                cabinet: cabinet,
-                node: node,
-                group1,
-                group2,
-                tags,
-                ip: ip,
-                port: row['Port'] || 502
-            };
-        }).filter(u => u.ip && u.node);
-
-        // Extract available options
-        const group1 = [...new Set(allUtilities.map(u => u.group1))].sort();
-        const group2 = [...new Set(allUtilities.map(u => u.group2))].sort();
-        
-        // Group tags by level (index in 0-based array)
-        const tagsByLevel = [];
-        allUtilities.forEach(u => {
-            if (Array.isArray(u.tags)) {
-                u.tags.forEach((tag, idx) => {
-                    if (!tagsByLevel[idx]) tagsByLevel[idx] = new Set();
-                    tagsByLevel[idx].add(tag);
+                if (!ip || !node) continue;
+
+                loaded.push({
+                    id: `cab${cabinet}_node${node}`,
+                    name: name,
+                    isGeneral: String(name).includes('GEN'),
+                    cabinet: cabinet,
+                    node: node,
+                    group1,
+                    group2,
+                    tags,
+                    ip: ip,
+                    port: row['Port'] || 502
                 });
             }
-        });
+            allUtilities = loaded;
+
+            // Extract available options
+            const group1 = [...new Set(allUtilities.map(u => u.group1))].sort();
+            const group2 = [...new Set(allUtilities.map(u => u.group2))].sort();
         
-        // Convert sets to sorted arrays
-        const availableTags = tagsByLevel.map(s => [...s].sort().filter(t => t));
+            // Group tags by level (index in 0-based array)
+            const tagsByLevel = [];
+            allUtilities.forEach(u => {
+                if (Array.isArray(u.tags)) {
+                    u.tags.forEach((tag, idx) => {
+                        if (!tagsByLevel[idx]) tagsByLevel[idx] = new Set();
+                        tagsByLevel[idx].add(tag);
+                    });
+                }
+            });
         
-        availableFilters = { group1, group2, tags: availableTags };
-        const selectedSet = new Set((activeFilters.selectedMachines || []).map(id => String(id)));
-        const enforceSelected = activeFilters.onlySelected;
-
-        // Apply filters
-        utilities = allUtilities.filter(u => {
-            const group1Selected = activeFilters.group1.length > 0;
-            const group2Selected = activeFilters.group2.length > 0;
-            const tagsSelected = activeFilters.tags && activeFilters.tags.length > 0;
-            
-            const group1Match = group1Selected ? activeFilters.group1.includes(u.group1) : true;
-            const group2Match = group2Selected ? activeFilters.group2.includes(u.group2) : true;
-            
-            // Tags match: if any of the selected tags are present in utility tags
-            // or maybe ALL? Standard filter logic for tags is typically OR (show items with Tag A OR Tag B).
-            // But if I want to narrow down, maybe AND? 
-            // The user said "combinazioni multiple". 
-            // Let's assume OR for now, as it's more common for "filtering" a list.
-            const tagsMatch = tagsSelected ? u.tags.some(t => activeFilters.tags.includes(t)) : true;
-            
-            const selectionMatch = enforceSelected ? selectedSet.has(String(u.id)) : true;
-
-            // Note: Currently we are combining Group1 AND Group2 AND Tags AND Selected
-            return group1Match && group2Match && tagsMatch && selectionMatch;
-        });
+            // Convert sets to sorted arrays
+            const availableTags = tagsByLevel.map(s => [...s].sort().filter(t => t));
+        
+            availableFilters = { group1, group2, tags: availableTags };
+            metaChanged = true;
+        }
 
+        applyUtilityFilters();
     } catch (e) {
         console.error('Error loading utilities:', e.message);
     }
 }
 
+/**
+ * Rebuilds the polled utility list from the loaded ones and the active filters.
+ * Does not touch the utilities file, so filter changes apply without a re-read.
+ */
+function applyUtilityFilters() {
+    // Utility ids are built as strings, so only the incoming selection needs converting
+    const selectedSet = new Set((activeFilters.selectedMachines || []).map(id => String(id)));
+    const enforceSelected = activeFilters.onlySelected;
+
+    // Lookup sets so each utility is matched in constant time
+    const group1Set = new Set(activeFilters.group1 || []);
+    const group2Set = new Set(activeFilters.group2 || []);
+    const tagsSet = new Set(activeFilters.tags || []);
+    const group1Selected = group1Set.size > 0;
+    const group2Selected = group2Set.size > 0;
+    const tagsSelected = tagsSet.size > 0;
+
+    // Apply filters
+    const filtered = allUtilities.filter(u => {
+        const group1Match = group1Selected ? group1Set.has(u.group1) : true;
+        const group2Match = group2Selected ? group2Set.has(u.group2) : true;
+        
+        // Tags match: if any of the selected tags are present in utility tags
+        // or maybe ALL? Standard filter logic for tags is typically OR (show items with Tag A OR Tag B).
+        // But if I want to narrow down, maybe AND? 
+        // The user said "combinazioni multiple". 
+        // Let's assume OR for now, as it's more common for "filtering" a list.
+        const tagsMatch = tagsSelected ? u.tags.some(t => tagsSet.has(t)) : true;
+        
+        const selectionMatch = enforceSelected ? selectedSet.has(u.id) : true;
+
+        // Note: Currently we are combining Group1 AND Group2 AND Tags AND Selected
+        return group1Match && group2Match && tagsMatch && selectionMatch;
+    });
+
+    // Keep the current list when the result is the same, so clients are not resent metadata
+    const unchanged = filtered.length === utilities.length && filtered.every((u, i) => u === utilities[i]);
+    if (!unchanged) {
+        utilities = filtered;
+        metaChanged = true;
+    }
+}
+
+// Values of the 'Report' column that enable a register
+const REPORT_ENABLED_VALUES = new Set(['y', 'yes', 'true', '1']);
+
+// Register label patterns used to classify readings (currents, L-L and L-N voltages)
+const CURRENT_LABEL_PATTERN = /A L|Current/;
+const LINE_TO_LINE_PATTERN = /L1-L2|L2-L3|L3-L1/;
+const LINE_TO_NEUTRAL_PATTERN = /L[1-3]-N/;
+
+// Number of 16-bit words per data type, checked in order (default: 2)
+const DATA_TYPE_WORDS = [
+    ['long long', 4],
+    ['short', 1],
+    ['float', 2]
+];
+
+function registerWordCount(dataType) {
+    const match = DATA_TYPE_WORDS.find(([name]) => dataType.includes(name));
+    return match ? match[1] : 2;
+}
+
+// Decoding kinds, resolved from the data type string at load time
+const DECODE_FLOAT = 0;
+const DECODE_SHORT = 1;
+const DECODE_UNSUPPORTED = 2;
+
+function registerDecodeKind(dataType) {
+    if (dataType.includes('float')) return DECODE_FLOAT;
+    if (dataType.includes('short')) return DECODE_SHORT;
+    return DECODE_UNSUPPORTED;
+}
+
+/**
+ * Assigns a register to a reading category once, at load time.
+ * Categories: 'PF', 'V-LL', 'V-LN', 'V' (other voltages), 'A', 'kW', 'other'.
+ */
+function classifyRegister(label) {
+    if (label.includes('PF')) return 'PF';
+    if (label.includes('V')) {
+        if (LINE_TO_LINE_PATTERN.test(label)) return 'V-LL';
+        if (LINE_TO_NEUTRAL_PATTERN.test(label)) return 'V-LN';
+        return 'V';
+    }
+    if (CURRENT_LABEL_PATTERN.test(label)) return 'A';
+    if (label === 'kW') return 'kW';
+    return 'other';
+}
+
 /**
  * Loads the Modbus register definitions.
  * Filters out registers marked as 'Report: No'.
@@ -340,18 +502,20 @@ function loadUtilities() {
 function loadRegisters() {
     try {
         const rawData = readDataFile(REGISTERS_FILE);
-        registers = rawData.filter(row => {
+        // Rows are cached by readDataFile: same array means nothing changed
+        if (rawData === registersSource) return;
+        registersSource = rawData;
+
+        // Single pass over the rows: disabled registers are skipped in place
+        const loaded = [];
+        for (const row of rawData) {
             const report = row['Report'];
-            return !report || ['y', 'yes', 'true', '1'].includes(String(report).toLowerCase());
-        }).map(row => {
+            if (report && !REPORT_ENABLED_VALUES.has(String(report).trim().toLowerCase())) continue;
+
             const endAddress = parseInt(row['Registro']);
             const dataType = (row['Lenght'] || row['Length'] || 'float').toLowerCase();
             
-            // Determine register count based on data type
-            let count = 2;
-            if (dataType.includes('long long')) count = 4;
-            else if (dataType.includes('short')) count = 1;
-            else if (dataType.includes('float')) count = 2;
+            const count = registerWordCount(dataType);
 
             // Calculate start address (Modbus often uses End Address in docs)
             const startAddress = endAddress - (count - 1);
@@ -365,16 +529,20 @@ function loadRegisters() {
                 factor = 0.001;
             }
 
-            return {
+            loaded.push({
                 startAddress: startAddress,
                 count: count,
                 label: label,
+                category: classifyRegister(label),
                 unit: row['Convert to'] || row['Readings'] || '',
                 dataType: dataType,
-                rounding: row['Rounding'] || row['rounding'],
+                decodeKind: registerDecodeKind(dataType),
                 factor: factor
-            };
-        });
+            });
+        }
+        registers = loaded;
+        readBlocks = buildReadBlocks(registers);
+        metaChanged = true;
     } catch (e) {
         console.error('Error loading registers:', e.message);
     }
@@ -384,74 +552,188 @@ function loadRegisters() {
 // Modbus Communication
 // ============================================================================
 
+// Registers at most this many words apart are fetched in the same request
+const BLOCK_MAX_GAP = 8;
+// Protocol limit for a single Read Holding Registers request
+const BLOCK_MAX_WORDS = 125;
+
 /**
- * Reads a single register from a connected Modbus client.
+ * Groups registers into read blocks covering nearby addresses.
+ * Returns [{ address, count, members: [{ register, offset }] }] sorted by address,
+ * where offset is the register position (in words) inside the block.
+ */
+function buildReadBlocks(regs) {
+    const sorted = [...regs].sort((a, b) => a.startAddress - b.startAddress);
+    const blocks = [];
+    let current = null;
+
+    for (const reg of sorted) {
+        const end = reg.startAddress + reg.count;
+        const fits = current &&
+            reg.startAddress - (current.address + current.count) <= BLOCK_MAX_GAP &&
+            end - current.address <= BLOCK_MAX_WORDS;
+
+        if (fits) {
+            current.count = Math.max(current.count, end - current.address);
+        } else {
+            current = { address: reg.startAddress, count: reg.count, members: [] };
+            blocks.push(current);
+        }
+        current.members.push({ register: reg, offset: reg.startAddress - current.address });
+    }
+    return blocks;
+}
+
+// Scratch space for float decoding: the 32-bit pattern is written as an integer and
+// read back as a float over the same memory, so no byte-order handling is needed.
+// Decoding is synchronous, so one scratch word is enough.
+const floatBits = new Uint32Array(1);
+const floatValue = new Float32Array(floatBits.buffer);
+
+/**
+ * Decodes one register from an array of 16-bit words, starting at offset.
  * Handles data type conversion (Float, Short) and Endianness swapping.
  */
+function decodeRegister(words, offset, register) {
+    if (register.decodeKind === DECODE_FLOAT) {
+        if (words.length >= offset + 2) {
+            // Handle Modbus Float Endianness (Swap words)
+            // [Word1, Word2] -> Word2 is the high half of the float
+            floatBits[0] = (words[offset + 1] << 16) | words[offset];
+            return floatValue[0];
+        }
+    } else if (register.decodeKind === DECODE_SHORT) {
+        if (words.length > offset) return words[offset];
+    }
+    return null;
+}
+
+/**
+ * Reads a single register from a connected Modbus client.
+ * Returns null when the meter answers with a Modbus exception (e.g. illegal
+ * data address); timeouts and connection errors are thrown to the caller.
+ */
 async function readRegister(client, register, nodeId) {
     try {
         client.setID(nodeId);
         const data = await client.readHoldingRegisters(register.startAddress, register.count);
-        
-        if (data.buffer) {
-            const buffer = data.buffer;
-            if (register.dataType.includes('float')) {
-                if (buffer.length >= 4) {
-                    // Handle Modbus Float Endianness (Swap words)
-                    // [Word1, Word2] -> [Word2, Word1] -> FloatBE
-                    const buf = Buffer.alloc(4);
-                    buf.writeUInt16BE(data.data[1], 0); // Low word
-                    buf.writeUInt16BE(data.data[0], 2); // High word
-                    return buf.readFloatBE(0);
-                }
-            } else if (register.dataType.includes('short')) {
-                return data.data[0];
-            }
-        }
+        return data.data ? decodeRegister(data.data, 0, register) : null;
+    } catch (e) {
+        if (e.modbusCode === undefined) throw e;
         return null;
+    }
+}
+
+/**
+ * Reads a whole block in one request. Returns the words, or null when the
+ * meter answers with a Modbus exception; timeouts and connection errors are
+ * thrown to the caller.
+ */
+async function readBlock(client, block, nodeId) {
+    try {
+        client.setID(nodeId);
+        const data = await client.readHoldingRegisters(block.address, block.count);
+        return data.data || null;
     } catch (e) {
+        if (e.modbusCode === undefined) throw e;
         return null;
     }
 }
 
+// Open Modbus TCP connections by 'ip:port', kept across polling cycles.
+// Nodes on the same IP are polled one at a time, so a connection is never shared concurrently.
+const modbusClients = new Map();
+
 /**
- * Connects to a utility (meter) and polls all configured registers.
- * Returns an object with values or error status.
+ * Returns the open connection for a gateway, connecting first if needed.
  */
-async function pollUtility(utility) {
+async function getModbusClient(ip, port) {
+    const key = `${ip}:${port}`;
+    const existing = modbusClients.get(key);
+    if (existing && existing.isOpen) return existing;
+    dropModbusClient(ip, port);
+
     const client = new ModbusRTU();
     client.on('error', (e) => {}); // Suppress internal library errors
+    client.setTimeout(config.modbus_timeout_s * 1000);
+    await client.connectTCP(ip, { port });
+    modbusClients.set(key, client);
+    return client;
+}
 
+/**
+ * Closes and forgets a gateway connection, so the next poll reconnects.
+ */
+function dropModbusClient(ip, port) {
+    const key = `${ip}:${port}`;
+    const client = modbusClients.get(key);
+    if (!client) return;
+    modbusClients.delete(key);
+    try {
+        client.close();
+    } catch (e) {}
+}
+
+/**
+ * Connects to a utility (meter) and polls all configured registers.
+ * Returns { result, connectFailed }: result holds the values or error status
+ * sent to clients; connectFailed is set when the gateway itself could not be
+ * reached and stays internal to the polling loop.
+ */
+async function pollUtility(utility) {
     const result = {
         values: {},
         status: 'OK',
         error: null
     };
 
+    let client;
+    try {
+        client = await getModbusClient(utility.ip, utility.port);
+    } catch (e) {
+        result.status = 'ERROR';
+        result.error = e.message;
+        return { result, connectFailed: true };
+    }
+
     try {
         client.setTimeout(config.modbus_timeout_s * 1000);
-        await client.connectTCP(utility.ip, { port: utility.port });
-        
-        for (const reg of registers) {
-            const val = await readRegister(client, reg, utility.node);
-            if (val !== null) {
-                result.values[reg.startAddress] = val * reg.factor;
+
+        let readCount = 0;
+        // A node that does not answer (timeout, closed port) throws out of the loop:
+        // it is marked ERROR at once instead of timing out on every remaining block
+        for (const block of readBlocks) {
+            const words = await readBlock(client, block, utility.node);
+            // A block spanning unmapped addresses can be rejected as a whole with an
+            // exception response: fall back to reading its registers one by one
+            if (!words && block.members.length === 1) continue;
+
+            for (const { register, offset } of block.members) {
+                const val = words
+                    ? decodeRegister(words, offset, register)
+                    : await readRegister(client, register, utility.node);
+                if (val !== null) {
+                    // Unscaled registers (factor 1) need no multiplication
+                    result.values[register.startAddress] = register.factor === 1 ? val : val * register.factor;
+                    readCount++;
+                }
             }
         }
 
-        if (Object.keys(result.values).length === 0) {
+        if (readCount === 0) {
             result.status = 'ERROR';
             result.error = 'No data read';
         }
     } catch (e) {
         result.status = 'ERROR';
         result.error = e.message;
-    } finally {
-        try {
-            client.close();
-        } catch (e) {}
     }
-    return result;
+
+    // The connection may be stale: reconnect on the next poll
+    if (result.status === 'ERROR') {
+        dropModbusClient(utility.ip, utility.port);
+    }
+    return { result, connectFailed: false };
 }
 
 // ============================================================================
@@ -460,21 +742,81 @@ async function pollUtility(utility) {
 
 const START_TIME = Date.now();
 
+// State is pushed to clients at this fixed cadence; changes in between are merged
+const BROADCAST_INTERVAL_MS = 250;
+let broadcastPending = false;
+
 /**
- * Sends the current state to all connected web clients.
- * Includes a timestamp to trigger client-side reloads if the server restarts.
+ * Marks the state as changed. The next broadcast tick sends a single snapshot
+ * for everything changed since the previous one, however many meters reported.
  */
 function broadcastUpdate() {
-    io.emit('update', {
+    broadcastPending = true;
+}
+
+/**
+ * State that only changes on reloads or filter updates, sent as a 'meta' event.
+ * Clients merge it into each 'update', which only carries the live readings.
+ */
+function getMeta() {
+    return {
         utilities,
         registers,
-        latestResults,
         config,
-        startTime: START_TIME,
-        isPaused,
         availableFilters,
         activeFilters
-    });
+    };
+}
+
+/**
+ * Creates an empty utility history. Each history is a ring of MAX_HISTORY_POINTS
+ * slots allocated once: the oldest reading is overwritten in place instead of
+ * shifting the whole array on every poll.
+ */
+function createHistoryRing() {
+    return { buf: new Array(MAX_HISTORY_POINTS), head: 0, filled: 0 };
+}
+
+/**
+ * Appends a reading to a utility's history ring.
+ */
+function pushHistory(ring, point) {
+    ring.buf[ring.head] = point;
+    ring.head = (ring.head + 1) % MAX_HISTORY_POINTS;
+    if (ring.filled < MAX_HISTORY_POINTS) ring.filled++;
+}
+
+/**
+ * Returns a utility's history oldest first, as sent to clients.
+ */
+function historyToArray(ring) {
+    if (ring.filled < MAX_HISTORY_POINTS) return ring.buf.slice(0, ring.filled);
+    return ring.buf.slice(ring.head).concat(ring.buf.slice(0, ring.head));
+}
+
+/**
+ * Sends the current state to all connected web clients.
+ * Only the results changed since the previous broadcast are sent, as 'changes';
+ * after latestResults is replaced the full set is sent as 'latestResults' instead.
+ * Includes a timestamp to trigger client-side reloads if the server restarts.
+ */
+function emitUpdate() {
+    broadcastPending = false;
+    if (metaChanged) {
+        metaChanged = false;
+        io.emit('meta', getMeta());
+    }
+    const payload = { startTime: START_TIME, isPaused };
+    if (resultsReset) {
+        payload.latestResults = latestResults;
+    } else {
+        const changes = {};
+        for (const id of changedResults) changes[id] = latestResults[id];
+        payload.changes = changes;
+    }
+    resultsReset = false;
+    changedResults.clear();
+    io.emit('update', payload);
 }
 
 async function run() {
@@ -482,12 +824,20 @@ async function run() {
     
     // Start the HTTP server
     server.listen(PORT, () => {
-        console.log(`Server running at http://localhost:${PORT}`);
-        console.log(chalk.cyan(`Energy Meters Web Logger | Interval: ${config.measurement_interval_ms}ms`));
+        // Single write for the whole banner
+        console.log([
+            `Server running at http://localhost:${PORT}`,
+            chalk.cyan(`Energy Meters Web Logger | Interval: ${config.measurement_interval_ms}ms`)
+        ].join('\n'));
     });
 
+    setInterval(() => {
+        if (broadcastPending) emitUpdate();
+    }, BROADCAST_INTERVAL_MS);
+
     // Infinite polling loop
     let loopCounter = 0;
+    let waitingLogged = false; // Log the wait for configuration once, not every second
     const FULL_SCAN_INTERVAL = 20; // Every 20 cycles, scan everything to catch status changes
 
     while (true) {
@@ -501,10 +851,12 @@ async function run() {
         loadRegisters();
 
         if (utilities.length === 0 || registers.length === 0) {
-            console.log("Waiting for configuration...");
+            if (!waitingLogged || VERBOSE) console.log("Waiting for configuration...");
+            waitingLogged = true;
             await new Promise(r => setTimeout(r, 1000));
             continue;
         }
+        waitingLogged = false;
 
         if (isPaused) {
             broadcastUpdate();
@@ -512,99 +864,124 @@ async function run() {
             continue;
         }
 
-        // Sequential Polling
+        // Filter thresholds are fixed for the whole cycle (a filter change restarts it)
+        const limits = getAlarmLimits();
+        const filterByCurrent = activeFilters.minCurrent && activeFilters.minCurrent !== 'all';
+        let currentThreshold = 5;
+        if (activeFilters.minCurrent === 'high20') currentThreshold = 20;
+        if (activeFilters.minCurrent === 'high40') currentThreshold = 40;
+
+        // Nodes behind the same IP share one gateway, so they are read one after another;
+        // different IPs are independent and are polled in parallel
+        const ipGroups = new Map();
         for (const util of utilities) {
-            if (needsReload) break; // Stop current cycle if filters changed
-
-            // --- Dynamic Filtering Logic ---
-            // Skip nodes that don't match the active dynamic filters (Current/Errors)
-            // unless it's a Full Scan cycle or we have no data for the node yet.
-            if (!isFullScan) {
-                const res = latestResults[util.id];
-                
-                if (res && res.values) {
-                    let shouldPoll = true;
-
-                    // 1. Check Current Filter
-                    if (activeFilters.minCurrent && activeFilters.minCurrent !== 'all') {
-                        let threshold = 5;
-                        if (activeFilters.minCurrent === 'high20') threshold = 20;
-                        if (activeFilters.minCurrent === 'high40') threshold = 40;
-                        
-                        let hasHighCurrent = false;
-                        for (const reg of registers) {
-                            if (reg.label.includes('A L') || reg.label.includes('Current')) {
-                                const val = res.values[reg.startAddress] || 0;
-                                if (val >= threshold) hasHighCurrent = true;
+            const key = `${util.ip}:${util.port}`;
+            if (!ipGroups.has(key)) ipGroups.set(key, []);
+            ipGroups.get(key).push(util);
+        }
+
+        await Promise.all([...ipGroups.values()].map(async (group) => {
+            // Set when the gateway refuses or times out the connection: the other
+            // nodes behind it are marked failed without waiting for more timeouts
+            let connectError = null;
+
+            for (const util of group) {
+                if (needsReload) break; // Stop current cycle if filters changed
+
+                // --- Dynamic Filtering Logic ---
+                // Skip nodes that don't match the active dynamic filters (Current/Errors)
+                // unless it's a Full Scan cycle or we have no data for the node yet.
+                if (!isFullScan) {
+                    const res = latestResults[util.id];
+            
+                    if (res && res.values) {
+                        let shouldPoll = true;
+
+                        // 1. Check Current Filter
+                        if (filterByCurrent) {
+                            let hasHighCurrent = false;
+                            for (const reg of registers) {
+                                if (reg.category === 'A') {
+                                    const val = res.values[reg.startAddress] || 0;
+                                    if (val >= currentThreshold) {
+                                        hasHighCurrent = true;
+                                        break; // One phase above threshold is enough
+                                    }
+                                }
                             }
+                            if (!hasHighCurrent) shouldPoll = false;
                         }
-                        if (!hasHighCurrent) shouldPoll = false;
-                    }
 
-                    // 2. Check Error Filter
-                    if (shouldPoll && activeFilters.onlyErrors) {
-                        let hasError = false;
-                        for (const reg of registers) {
-                            const val = res.values[reg.startAddress];
-                            if (val !== undefined) {
-                                // PF Check
-                                if (reg.label.includes('PF')) {
-                                    const redMax = config.pf_red_max !== undefined ? config.pf_red_max : 0.4;
-                                    if (val < redMax) hasError = true;
-                                }
-                                // Voltage Check
-                                else if (reg.label.includes('V')) {
-                                    let min, max;
-                                    if (reg.label.includes('L1-L2') || reg.label.includes('L2-L3') || reg.label.includes('L3-L1')) {
-                                        min = config.v_ll_min !== undefined ? config.v_ll_min : 380;
-                                        max = config.v_ll_max !== undefined ? config.v_ll_max : 420;
-                                    } else if (reg.label.includes('L1-N') || reg.label.includes('L2-N') || reg.label.includes('L3-N')) {
-                                        min = config.v_ln_min !== undefined ? config.v_ln_min : 210;
-                                        max = config.v_ln_max !== undefined ? config.v_ln_max : 250;
+                        // 2. Check Error Filter
+                        if (shouldPoll && activeFilters.onlyErrors) {
+                            let hasError = false;
+                            for (const reg of registers) {
+                                const val = res.values[reg.startAddress];
+                                if (val !== undefined) {
+                                    // PF Check
+                                    if (reg.category === 'PF') {
+                                        if (val < limits.pfRedMax) hasError = true;
                                     }
-                                    if (min !== undefined && max !== undefined) {
-                                        if (val < min || val > max) hasError = true;
+                                    // Voltage Check
+                                    else if (reg.category.startsWith('V')) {
+                                        let min, max;
+                                        if (reg.category === 'V-LL') {
+                                            min = limits.vLLMin;
+                                            max = limits.vLLMax;
+                                        } else if (reg.category === 'V-LN') {
+                                            min = limits.vLNMin;
+                                            max = limits.vLNMax;
+                                        }
+                                        if (min !== undefined && max !== undefined) {
+                                            if (val < min || val > max) hasError = true;
+                                        }
                                     }
-                                }
-                                // Negative Check
-                                else if (val < 0) {
-                                    hasError = true;
+                                    // Negative Check
+                                    else if (val < 0) {
+                                        hasError = true;
+                                    }
+                                    if (hasError) break; // One error is enough
                                 }
                             }
+                            if (!hasError) shouldPoll = false;
                         }
-                        if (!hasError) shouldPoll = false;
-                    }
 
-                    if (!shouldPoll) continue; // Skip this node
+                        if (!shouldPoll) continue; // Skip this node
+                    }
                 }
-            }
-            // -------------------------------
-
-            // 1. Notify clients that we are reading this utility
-            latestResults[util.id] = { ...latestResults[util.id], status: 'READING' };
-            broadcastUpdate();
-
-            // 2. Perform the Modbus read
-            const result = await pollUtility(util);
-            
-            // 3. Update results and notify clients
-            latestResults[util.id] = result;
-            
-            // Update History
-            if (!history[util.id]) history[util.id] = [];
-            if (result.status === 'OK') {
-                history[util.id].push({
-                    timestamp: Date.now(),
-                    values: result.values
-                });
-                // Trim history
-                if (history[util.id].length > MAX_HISTORY_POINTS) {
-                    history[util.id].shift();
+                // -------------------------------
+
+                // 1. Notify clients that we are reading this utility
+                latestResults[util.id] = { ...latestResults[util.id], status: 'READING' };
+                changedResults.add(util.id);
+                broadcastUpdate();
+
+                // 2. Perform the Modbus read
+                let result;
+                if (connectError) {
+                    result = { values: {}, status: 'ERROR', error: connectError };
+                } else {
+                    const poll = await pollUtility(util);
+                    result = poll.result;
+                    if (poll.connectFailed) connectError = result.error;
+                }
+        
+                // 3. Update results and notify clients
+                latestResults[util.id] = result;
+                changedResults.add(util.id);
+        
+                // Update History
+                if (!history[util.id]) history[util.id] = createHistoryRing();
+                if (result.status === 'OK') {
+                    pushHistory(history[util.id], {
+                        timestamp: Date.now(),
+                        values: result.values
+                    });
                 }
-            }
 
-            broadcastUpdate();
-        }
+                broadcastUpdate();
+            }
+        }));
 
         // If reloading, skip the wait interval to start immediately
         if (needsReload) continue;